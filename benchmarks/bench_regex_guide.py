@@ -24,6 +24,7 @@ class RegexGuideBenchmark:
     def setup(self, pattern_name):
         self.tokenizer = setup_tokenizer()
         self.pattern = regex_samples[pattern_name]
+        self.core_count = psutil.cpu_count(logical=False)
 
     def time_regex_to_guide(self, pattern_name):
         RegexGuide.from_regex(self.pattern, self.tokenizer)
@@ -31,21 +32,22 @@ class RegexGuideBenchmark:
     def time_regex_to_guide_parallel(self, pattern_name):
         # Default GIL switch interval is 5ms (0.005), which isn't helpful for cpu heavy tasks,
         # this parallel case should be relatively close in runtime to one thread, but it is not,
-        # because of the GIL.
-        core_count = psutil.cpu_count(logical=False)
-        with ThreadPoolExecutor(max_workers=core_count) as executor:
-            list(executor.map(self._from_regex, [pattern_name] * core_count))
+        # because of the GIL. The Rust `Index` construction releases the GIL, so only the
+        # Python-side FSM building (interegular parsing and byte-level expansion) is serialized.
+        with ThreadPoolExecutor(max_workers=self.core_count) as executor:
+            list(executor.map(self._from_regex, [pattern_name] * self.core_count))
 
     def time_regex_to_guide_parallel_with_custom_switch_interval(self, pattern_name):
         # This test is to show, that if GIL's switch interval is set to be longer, then the parallel
         # test's runtime on physical cores will be much closer to the one-threaded case.
+        # Longer intervals only help the Python-side FSM building, the `Index` construction
+        # itself already runs with the GIL released.
         import sys
 
         sys.setswitchinterval(5)
 
-        core_count = psutil.cpu_count(logical=False)
-        with ThreadPoolExecutor(max_workers=core_count) as executor:
-            list(executor.map(self._from_regex, [pattern_name] * core_count))
+        with ThreadPoolExecutor(max_workers=self.core_count) as executor:
+            list(executor.map(self._from_regex, [pattern_name] * self.core_count))
 
     def _from_regex(self, pattern_name):
         RegexGuide.from_regex(self.pattern, self.tokenizer)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 import torch
@@ -112,6 +113,13 @@ class TransformerTokenizer:
         self.__init__(state["tokenizer"])
 
 
+@lru_cache(maxsize=1)
 def setup_tokenizer():
+    """Load the benchmark tokenizer once per process.
+
+    The tokenizer is never mutated by the guides built from it, so every
+    benchmark `setup` can share the same instance instead of reloading it.
+
+    """
     tokenizer = AutoTokenizer.from_pretrained("gpt2")
     return TransformerTokenizer(tokenizer)
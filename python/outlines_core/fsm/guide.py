@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Callable, List, Optional, Protocol, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple, Union
 
 import interegular
 import torch
@@ -194,6 +194,17 @@ class RegexGuide(Guide):
         self.empty_token_ids = empty_token_ids
         self.eos_tensor = eos_tensor
         self.initial_state = initial_state
+        self._instruction_cache: Dict[int, Instruction] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The instruction cache is rebuilt lazily; don't serialize its tensors.
+        state.pop("_instruction_cache", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._instruction_cache = {}
 
     @classmethod
     def from_regex(
@@ -252,6 +263,11 @@ class RegexGuide(Guide):
         in a final state of the guide. We only authorize EOS tokens in the final
         state.
 
+        The instruction computed for a state is cached, so that the allowed
+        tokens are only converted to a tensor the first time the state is
+        visited. The returned `Generate.tokens` tensor is therefore shared
+        across calls and must not be modified in place.
+
         Parameters
         ----------
         state
@@ -264,12 +280,18 @@ class RegexGuide(Guide):
         """
         if state == -1:
             return Write(self.eos_tensor)
-        next_tokens_mask = self.states_to_token_maps.get_allowed_tokens(state)
-        # TODO: Create the Write and Generate objects within Rust instead?
-        if next_tokens_mask is None:
-            return Write(self.eos_tensor)
 
-        return Generate(torch.tensor(next_tokens_mask))
+        instruction = self._instruction_cache.get(state)
+        if instruction is None:
+            next_tokens_mask = self.states_to_token_maps.get_allowed_tokens(state)
+            # TODO: Create the Write and Generate objects within Rust instead?
+            if next_tokens_mask is None:
+                instruction = Write(self.eos_tensor)
+            else:
+                instruction = Generate(torch.tensor(next_tokens_mask))
+            self._instruction_cache[state] = instruction
+
+        return instruction
 
     def get_next_state(self, state: int, token_id: int) -> int:
         """Update the state of the guide.
@@ -99,7 +99,7 @@ class Index:
     def is_final_state(self, state: int) -> bool:
         """Determines whether the current state is a final state."""
         ...
-    def get_index_dict(self) -> Dict[int, Dict[int, int]]:
+    def get_transitions(self) -> Dict[int, Dict[int, int]]:
         """Returns the Index as a Python Dict object."""
         ...
     def get_initial_state(self) -> int:
@@ -382,8 +382,7 @@ def gpt2_unicode_to_bytes():
     return {v: k for k, v in gpt2_bytes_to_unicode().items()}
 
 
-@lru_cache
-def reduced_vocabulary(
+def _reduced_vocabulary(
     tokenizer,
 ) -> Tuple[Dict[str, List[int]], Set[int]]:
     """Create a map from decoded vocabulary tokens to lists of equivalent token ids."""
@@ -437,6 +436,26 @@ def reduced_vocabulary(
     return vocabulary, empty_token_ids
 
 
+@lru_cache
+def reduced_vocabulary(
+    tokenizer,
+) -> Tuple[Dict[str, List[int]], Set[int]]:
+    """Create a map from decoded vocabulary tokens to lists of equivalent token ids."""
+    return _reduced_vocabulary(tokenizer)
+
+
+@lru_cache
+def reduced_vocabulary_rs(tokenizer) -> Tuple[Vocabulary, Set[int]]:
+    """Create the Rust `Vocabulary` of a tokenizer's reduced vocabulary.
+
+    The result is cached per tokenizer, so that indexing several regular
+    expressions with the same tokenizer hashes the tokenizer and hands the
+    vocabulary to Rust only once.
+    """
+    tokens_to_token_ids, empty_token_ids = _reduced_vocabulary(tokenizer)
+    return Vocabulary.from_dict(tokens_to_token_ids), empty_token_ids
+
+
 def create_fsm_index_tokenizer(
     fsm: BetterFSM,
     tokenizer,
@@ -470,11 +489,11 @@ def create_fsm_index_tokenizer(
 
         `fsm` needs to be deterministically ordered so that future caching makes sense.
     """
-    tokens_to_token_ids, empty_token_ids = reduced_vocabulary(tokenizer)
+    vocabulary, empty_token_ids = reduced_vocabulary_rs(tokenizer)
 
     states_to_token_subsets = Index(  # type: ignore
         fsm.fsm_info,
-        Vocabulary.from_dict(tokens_to_token_ids),
+        vocabulary,
         tokenizer.eos_token_id,
         frozenset(frozen_tokens) if frozen_tokens is not None else frozenset(),
     )
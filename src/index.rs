@@ -1,6 +1,6 @@
 /// Construct an Index.
-use crate::prelude::{State, TransitionKey};
-use crate::regex::{get_vocabulary_transition_keys, state_scan_tokens};
+use crate::prelude::{State, TokenId, TransitionKey};
+use crate::regex::{get_vocabulary_transition_keys, walk_fsm_to_end};
 use crate::vocabulary::Vocabulary;
 use crate::{Error, Result};
 use bincode::{Decode, Encode};
@@ -33,6 +33,42 @@ impl FSMInfo {
     }
 }
 
+/// Tokens sharing the same first transition key, with their transition keys and
+/// token ids packed into contiguous buffers.
+#[derive(Debug, Default)]
+struct TokensBucket {
+    transition_keys: Vec<TransitionKey>,
+    transition_keys_ends: Vec<usize>,
+    token_ids: Vec<TokenId>,
+    token_ids_ends: Vec<usize>,
+}
+
+impl TokensBucket {
+    fn push(&mut self, transition_keys: &[TransitionKey], token_ids: &[TokenId]) {
+        self.transition_keys.extend_from_slice(transition_keys);
+        self.transition_keys_ends.push(self.transition_keys.len());
+        self.token_ids.extend_from_slice(token_ids);
+        self.token_ids_ends.push(self.token_ids.len());
+    }
+
+    fn iter(&self) -> impl Iterator<Item = (&[TransitionKey], &[TokenId])> {
+        let mut transition_keys_start = 0;
+        let mut token_ids_start = 0;
+        self.transition_keys_ends
+            .iter()
+            .zip(&self.token_ids_ends)
+            .map(move |(&transition_keys_end, &token_ids_end)| {
+                let token = (
+                    &self.transition_keys[transition_keys_start..transition_keys_end],
+                    &self.token_ids[token_ids_start..token_ids_end],
+                );
+                transition_keys_start = transition_keys_end;
+                token_ids_start = token_ids_end;
+                token
+            })
+    }
+}
+
 #[derive(Debug, Encode, Decode)]
 pub struct Index {
     initial: u32,
@@ -59,17 +95,50 @@ impl Index {
             &frozen_tokens,
         );
 
+        // Bucket tokens by their first transition key, so that each state only walks
+        // the tokens that can leave it instead of the whole vocabulary. Buckets are
+        // packed, so the walk reads sequential memory rather than chasing hash map entries.
+        let mut tokens_by_first_key: FxHashMap<TransitionKey, TokensBucket> = FxHashMap::default();
+        for (token, token_ids) in vocabulary.iter() {
+            let token_transition_keys = &vocabulary_transition_keys[token];
+            if let Some(first_key) = token_transition_keys.first() {
+                tokens_by_first_key
+                    .entry(*first_key)
+                    .or_default()
+                    .push(token_transition_keys, token_ids);
+            }
+        }
+        drop(vocabulary_transition_keys);
+
+        let mut states_transition_keys: FxHashMap<State, Vec<TransitionKey>> = FxHashMap::default();
+        for &(state, trans_key) in fsm_info.transitions.keys() {
+            states_transition_keys
+                .entry(state)
+                .or_default()
+                .push(trans_key);
+        }
+
         while let Some(start_state) = next_states.iter().cloned().next() {
             next_states.remove(&start_state);
 
-            let token_ids_end_states = state_scan_tokens(
-                &fsm_info.transitions,
-                fsm_info.initial,
-                &fsm_info.finals,
-                vocabulary,
-                &vocabulary_transition_keys,
-                start_state,
-            );
+            let mut token_ids_end_states: Vec<(TokenId, State)> = Vec::new();
+            for trans_key in states_transition_keys
+                .get(&start_state)
+                .into_iter()
+                .flatten()
+            {
+                let Some(bucket) = tokens_by_first_key.get(trans_key) else {
+                    continue;
+                };
+                for (token_transition_keys, token_ids) in bucket.iter() {
+                    if let Some(end_state) =
+                        walk_fsm_to_end(&fsm_info.transitions, token_transition_keys, start_state)
+                    {
+                        token_ids_end_states
+                            .extend(token_ids.iter().map(|&token_id| (token_id, end_state)));
+                    }
+                }
+            }
 
             for (token_id, end_state) in &token_ids_end_states {
                 let inner_map = states_to_token_subsets.entry(start_state).or_default();
@@ -130,3 +199,68 @@ impl Index {
         &self.states_to_token_subsets
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    // Byte-level FSM of `0|[1-9][0-9]*`, with `0` -> 1, `[1-9]` -> 2 and anything else -> 0.
+    fn fsm_info() -> FSMInfo {
+        FSMInfo::new(
+            0,
+            FxHashSet::from_iter([1, 2]),
+            FxHashMap::from_iter([((0, 1), 1), ((0, 2), 2), ((2, 1), 2), ((2, 2), 2)]),
+            0,
+            FxHashMap::from_iter(
+                (0..10).map(|digit| (digit.to_string(), if digit == 0 { 1 } else { 2 })),
+            ),
+        )
+    }
+
+    #[test]
+    fn tokens_bucket_round_trip() {
+        let mut bucket = TokensBucket::default();
+        bucket.push(&[1, 2, 3], &[7]);
+        bucket.push(&[1], &[8, 9]);
+
+        let tokens: Vec<_> = bucket.iter().collect();
+        assert_eq!(
+            tokens,
+            vec![(&[1, 2, 3][..], &[7][..]), (&[1][..], &[8, 9][..])]
+        );
+    }
+
+    #[test]
+    fn index_from_fsm_info() {
+        let vocabulary = Vocabulary::new(None)
+            .insert("blah", 0)
+            .insert("1a", 1)
+            .insert("2", 2)
+            .insert("0", 3);
+
+        let index =
+            Index::new(&fsm_info(), &vocabulary, 4, FxHashSet::default()).expect("Index failed");
+
+        let mut allowed = index.allowed_tokens(0).expect("No allowed tokens");
+        allowed.sort();
+        assert_eq!(allowed, vec![2, 3]);
+
+        let mut allowed = index.allowed_tokens(2).expect("No allowed tokens");
+        allowed.sort();
+        assert_eq!(allowed, vec![2, 3, 4]);
+
+        assert_eq!(index.allowed_tokens(1), None);
+        assert_eq!(index.next_state(0, 3), Some(1));
+        assert_eq!(index.next_state(2, 2), Some(2));
+        assert_eq!(index.next_state(0, 1), None);
+        assert_eq!(index.next_state(2, 4), None);
+    }
+
+    #[test]
+    fn index_error_without_matching_tokens() {
+        let vocabulary = Vocabulary::new(None).insert("blah", 0).insert("1a", 1);
+
+        let index = Index::new(&fsm_info(), &vocabulary, 4, FxHashSet::default());
+        assert!(matches!(index, Err(Error::IndexError)));
+    }
+}
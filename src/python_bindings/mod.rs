@@ -8,7 +8,7 @@ use crate::regex::walk_fsm;
 use bincode::config;
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
-use pyo3::types::PyDict;
+use pyo3::types::{IntoPyDict, PyDict};
 use pyo3::wrap_pyfunction;
 use rustc_hash::{FxHashMap, FxHashSet};
 use serde_json::Value;
@@ -180,6 +180,7 @@ pub fn walk_fsm_py(
     text_signature = "(fsm_transitions, fsm_initial, fsm_finals, vocabulary, vocabulary_transition_keys, start_state)"
 )]
 pub fn state_scan_tokens_py(
+    py: Python<'_>,
     fsm_transitions: FxHashMap<(State, TransitionKey), State>,
     fsm_initial: State,
     fsm_finals: FxHashSet<State>,
@@ -187,14 +188,16 @@ pub fn state_scan_tokens_py(
     vocabulary_transition_keys: FxHashMap<String, Vec<TransitionKey>>,
     start_state: State,
 ) -> PyResult<FxHashSet<(TokenId, State)>> {
-    Ok(state_scan_tokens(
-        &fsm_transitions,
-        fsm_initial,
-        &fsm_finals,
-        &vocabulary.0,
-        &vocabulary_transition_keys,
-        start_state,
-    ))
+    Ok(py.allow_threads(|| {
+        state_scan_tokens(
+            &fsm_transitions,
+            fsm_initial,
+            &fsm_finals,
+            &vocabulary.0,
+            &vocabulary_transition_keys,
+            start_state,
+        )
+    }))
 }
 
 #[pyfunction(name = "get_token_transition_keys")]
@@ -216,17 +219,20 @@ pub fn get_token_transition_keys_py(
     text_signature = "(alphabet_symbol_mapping, alphabet_anything_value, vocabulary, frozen_tokens)"
 )]
 pub fn get_vocabulary_transition_keys_py(
+    py: Python<'_>,
     alphabet_symbol_mapping: FxHashMap<String, TransitionKey>,
     alphabet_anything_value: TransitionKey,
     vocabulary: &PyVocabulary,
     frozen_tokens: FxHashSet<String>,
 ) -> PyResult<FxHashMap<String, Vec<TransitionKey>>> {
-    Ok(get_vocabulary_transition_keys(
-        &alphabet_symbol_mapping,
-        alphabet_anything_value,
-        &vocabulary.0,
-        &frozen_tokens,
-    ))
+    Ok(py.allow_threads(|| {
+        get_vocabulary_transition_keys(
+            &alphabet_symbol_mapping,
+            alphabet_anything_value,
+            &vocabulary.0,
+            &frozen_tokens,
+        )
+    }))
 }
 
 #[pyfunction(name = "create_fsm_index_end_to_end")]
@@ -237,48 +243,49 @@ pub fn create_fsm_index_end_to_end_py<'py>(
     vocabulary: &PyVocabulary,
     frozen_tokens: FxHashSet<String>,
 ) -> PyResult<Bound<'py, PyDict>> {
-    let states_to_token_subsets = PyDict::new_bound(py);
-    let mut seen: FxHashSet<State> = FxHashSet::default();
-    let mut next_states: FxHashSet<State> = FxHashSet::from_iter(vec![fsm_info.initial]);
-
-    let vocabulary_transition_keys = get_vocabulary_transition_keys(
-        &fsm_info.alphabet_symbol_mapping,
-        fsm_info.alphabet_anything_value,
-        &vocabulary.0,
-        &frozen_tokens,
-    );
-
-    while let Some(start_state) = next_states.iter().cloned().next() {
-        next_states.remove(&start_state);
-
-        // TODO: Return Pydict directly at construction
-        let token_ids_end_states = state_scan_tokens(
-            &fsm_info.transitions,
-            fsm_info.initial,
-            &fsm_info.finals,
+    let states_to_token_subsets = py.allow_threads(|| {
+        let mut states_to_token_subsets: FxHashMap<State, FxHashMap<TokenId, State>> =
+            FxHashMap::default();
+        let mut seen: FxHashSet<State> = FxHashSet::default();
+        let mut next_states: FxHashSet<State> = FxHashSet::from_iter(vec![fsm_info.initial]);
+
+        let vocabulary_transition_keys = get_vocabulary_transition_keys(
+            &fsm_info.alphabet_symbol_mapping,
+            fsm_info.alphabet_anything_value,
             &vocabulary.0,
-            &vocabulary_transition_keys,
-            start_state,
+            &frozen_tokens,
         );
 
-        for (token_id, end_state) in token_ids_end_states {
-            if let Ok(Some(existing_dict)) = states_to_token_subsets.get_item(start_state) {
-                existing_dict.set_item(token_id, end_state)?;
-            } else {
-                let new_dict = PyDict::new_bound(py);
-                new_dict.set_item(token_id, end_state)?;
-                states_to_token_subsets.set_item(start_state, new_dict)?;
+        while let Some(start_state) = next_states.iter().cloned().next() {
+            next_states.remove(&start_state);
+
+            let token_ids_end_states = state_scan_tokens(
+                &fsm_info.transitions,
+                fsm_info.initial,
+                &fsm_info.finals,
+                &vocabulary.0,
+                &vocabulary_transition_keys,
+                start_state,
+            );
+
+            for (token_id, end_state) in token_ids_end_states {
+                states_to_token_subsets
+                    .entry(start_state)
+                    .or_default()
+                    .insert(token_id, end_state);
+
+                if !seen.contains(&end_state) {
+                    next_states.insert(end_state);
+                }
             }
 
-            if !seen.contains(&end_state) {
-                next_states.insert(end_state);
-            }
+            seen.insert(start_state);
         }
 
-        seen.insert(start_state);
-    }
+        states_to_token_subsets
+    });
 
-    Ok(states_to_token_subsets)
+    Ok(states_to_token_subsets.into_py_dict_bound(py))
 }
 
 #[pyclass(name = "Vocabulary")]
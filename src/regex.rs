@@ -40,8 +40,8 @@ pub fn walk_fsm(
 
 pub fn state_scan_tokens(
     fsm_transitions: &FxHashMap<(State, TransitionKey), State>,
-    fsm_initial: State,
-    fsm_finals: &FxHashSet<State>,
+    _fsm_initial: State,
+    _fsm_finals: &FxHashSet<State>,
     vocabulary: &Vocabulary,
     vocabulary_transition_keys: &FxHashMap<Token, Vec<TransitionKey>>,
     start_state: State,
@@ -50,27 +50,39 @@ pub fn state_scan_tokens(
 
     for (token, token_ids) in vocabulary.iter() {
         let token_transition_keys = &vocabulary_transition_keys[token];
-        let state_seq = walk_fsm(
-            fsm_transitions,
-            fsm_initial,
-            fsm_finals,
-            token_transition_keys,
-            start_state,
-            false,
-        );
-
-        if state_seq.len() < token_transition_keys.len() {
+        let Some(end_state) = walk_fsm_to_end(fsm_transitions, token_transition_keys, start_state)
+        else {
             continue;
-        }
+        };
 
         for &token_id in token_ids {
-            res.insert((token_id, *state_seq.last().unwrap()));
+            res.insert((token_id, end_state));
         }
     }
 
     res
 }
 
+/// Walks the whole token from `start_state` and returns the state it ends in.
+///
+/// Equivalent to a partial `walk_fsm` that consumed every transition key, but
+/// without collecting the intermediate states, since scanning the vocabulary
+/// only needs the final one.
+pub(crate) fn walk_fsm_to_end(
+    fsm_transitions: &FxHashMap<(State, TransitionKey), State>,
+    token_transition_keys: &[TransitionKey],
+    start_state: State,
+) -> Option<State> {
+    if token_transition_keys.is_empty() {
+        return None;
+    }
+    token_transition_keys
+        .iter()
+        .try_fold(start_state, |state, &trans_key| {
+            fsm_transitions.get(&(state, trans_key)).copied()
+        })
+}
+
 pub fn get_token_transition_keys(
     alphabet_symbol_mapping: &FxHashMap<String, TransitionKey>,
     alphabet_anything_value: TransitionKey,
@@ -0,0 +1,24 @@
+import pytest
+from transformers import AutoTokenizer
+
+from tests.fsm.transformer_tokenizer import TransformerTokenizer
+
+
+@pytest.fixture(
+    scope="session",
+    params=[
+        ("openai-community/gpt2", "607a30d783dfa663caf39e06633721c8d4cfcd7e"),
+        ("microsoft/phi-2", "ef382358ec9e382308935a992d908de099b64c23"),
+        ("Qwen/Qwen1.5-0.5B-Chat", "4d14e384a4b037942bb3f3016665157c8bcb70ea"),
+        (
+            "NousResearch/Hermes-2-Pro-Llama-3-8B",
+            "783fd50eb82d7f57758de033861f54d62dde234f",
+        ),
+    ],
+    ids=lambda param: param[0],
+)
+def pretrained_tokenizer(request):
+    """Load each pinned pretrained tokenizer once for the whole session."""
+    hf_tokenizer_uri, revision = request.param
+    tokenizer = AutoTokenizer.from_pretrained(hf_tokenizer_uri, revision=revision)
+    return TransformerTokenizer(tokenizer)
@@ -6,7 +6,7 @@ from outlines_core.fsm.guide import Generate, RegexGuide, StopAtEOSGuide, Write
 def assert_expected_tensor_ids(tensor, ids):
     assert len(tensor) == len(ids)
     norm_tensor = sorted(map(int, tensor))
-    norm_ids = sorted(map(int, tensor))
+    norm_ids = sorted(map(int, ids))
     assert norm_tensor == norm_ids, (norm_tensor, norm_ids)
 
 
@@ -72,6 +72,7 @@ def test_from_regex():
     instruction = fsm.get_next_instruction(0)
     assert isinstance(instruction, Generate)
     assert_expected_tensor_ids(instruction.tokens, [1])
+    assert fsm.get_next_instruction(0) is instruction
 
     assert fsm.get_next_state(state=0, token_id=1) == 1
     assert fsm.get_next_state(state=0, token_id=tokenizer.eos_token_id) == -1
@@ -1,9 +1,5 @@
-from typing import List, Tuple, Union
-
 import interegular
 import pytest
-import torch
-from datasets.fingerprint import Hasher
 from outlines_core.fsm.outlines_core_rs import Vocabulary
 from outlines_core.fsm.regex import (
     BetterAlphabet,
@@ -16,115 +12,11 @@ from outlines_core.fsm.regex import (
     make_byte_level_fsm,
     make_deterministic_fsm,
     reduced_vocabulary,
+    reduced_vocabulary_rs,
 )
-from transformers import AutoTokenizer, PreTrainedTokenizer
-
-
-def get_llama_tokenizer_types():
-    """Get all the Llama tokenizer types/classes that need work-arounds.
-
-    When they can't be imported, a dummy class is created.
-
-    """
-    try:
-        from transformers.models.llama import LlamaTokenizer
-    except ImportError:
-
-        class LlamaTokenizer:  # type: ignore
-            pass
-
-    try:
-        from transformers.models.llama import LlamaTokenizerFast
-    except ImportError:
-
-        class LlamaTokenizerFast:  # type: ignore
-            pass
-
-    try:
-        from transformers.models.code_llama import CodeLlamaTokenizer
-    except ImportError:
-
-        class CodeLlamaTokenizer:  # type: ignore
-            pass
-
-    try:
-        from transformers.models.code_llama import CodeLlamaTokenizerFast
-    except ImportError:
-
-        class CodeLlamaTokenizerFast:  # type: ignore
-            pass
-
-    return (
-        LlamaTokenizer,
-        LlamaTokenizerFast,
-        CodeLlamaTokenizer,
-        CodeLlamaTokenizerFast,
-    )
-
-
-class TransformerTokenizer:
-    """Represents a tokenizer for models in the `transformers` library."""
-
-    def __init__(self, tokenizer: PreTrainedTokenizer, **kwargs):
-        self.tokenizer = tokenizer
-        self.eos_token_id = self.tokenizer.eos_token_id
-        self.eos_token = self.tokenizer.eos_token
-
-        if self.tokenizer.pad_token_id is None:
-            self.tokenizer.pad_token_id = self.tokenizer.eos_token_id
-            self.pad_token_id = self.eos_token_id
-        else:
-            self.pad_token_id = self.tokenizer.pad_token_id
-            self.pad_token = self.tokenizer.pad_token
-
-        self.special_tokens = set(self.tokenizer.all_special_tokens)
-
-        self.vocabulary = self.tokenizer.get_vocab()
-        self.is_llama = isinstance(self.tokenizer, get_llama_tokenizer_types())
-
-    def encode(
-        self, prompt: Union[str, List[str]], **kwargs
-    ) -> Tuple[torch.LongTensor, torch.LongTensor]:
-        kwargs["padding"] = True
-        kwargs["return_tensors"] = "pt"
-        output = self.tokenizer(prompt, **kwargs)
-        return output["input_ids"], output["attention_mask"]
-
-    def decode(self, token_ids: torch.LongTensor) -> List[str]:
-        text = self.tokenizer.batch_decode(token_ids, skip_special_tokens=True)
-        return text
-
-    def convert_token_to_string(self, token: str) -> str:
-        from transformers.file_utils import SPIECE_UNDERLINE
+from transformers import AutoTokenizer
 
-        string = self.tokenizer.convert_tokens_to_string([token])
-
-        if self.is_llama:
-            # A hack to handle missing spaces to HF's Llama tokenizers
-            if token.startswith(SPIECE_UNDERLINE) or token == "<0x20>":
-                return " " + string
-
-        return string
-
-    def __hash__(self):
-        return hash(Hasher.hash(self.tokenizer))
-
-    def __eq__(self, other):
-        if isinstance(other, type(self)):
-            if hasattr(self, "model_name") and hasattr(self, "kwargs"):
-                return (
-                    other.model_name == self.model_name and other.kwargs == self.kwargs
-                )
-            else:
-                return other.tokenizer == self.tokenizer
-        return NotImplemented
-
-    def __getstate__(self):
-        state = {"tokenizer": self.tokenizer}
-        return state
-
-    def __setstate__(self, state):
-        self.__init__(state["tokenizer"])
+from tests.fsm.transformer_tokenizer import TransformerTokenizer
 
 
 def identity(s):
@@ -337,19 +229,7 @@ def test_create_fsm_index_end_to_end_multi_byte():
     assert res == {0: {5: 3, 6: 3, 7: 7, 2: 2}, 3: {2: 3, 3: 3, 4: 3}}
 
 
-@pytest.mark.parametrize(
-    "hf_tokenizer_uri, revision",
-    [
-        ("openai-community/gpt2", "607a30d783dfa663caf39e06633721c8d4cfcd7e"),
-        ("microsoft/phi-2", "ef382358ec9e382308935a992d908de099b64c23"),
-        ("Qwen/Qwen1.5-0.5B-Chat", "4d14e384a4b037942bb3f3016665157c8bcb70ea"),
-        (
-            "NousResearch/Hermes-2-Pro-Llama-3-8B",
-            "783fd50eb82d7f57758de033861f54d62dde234f",
-        ),
-    ],
-)
-def test_create_fsm_index_tokenizer(hf_tokenizer_uri, revision):
+def test_create_fsm_index_tokenizer(pretrained_tokenizer):
     # The combined regular expressions of a lexer state in a Python grammar
     regex_str = "(?:(?:[0-9](?:(?:_)?[0-9])*(?:e|E)(?:(?:\\+|\\-))?[0-9](?:(?:_)?[0-9])*|(?:[0-9](?:(?:_)?[0-9])*\\.(?:[0-9](?:(?:_)?[0-9])*)?|\\.[0-9](?:(?:_)?[0-9])*)(?:(?:e|E)(?:(?:\\+|\\-))?[0-9](?:(?:_)?[0-9])*)?)|[0-9](?:(?:_)?[0-9])*)(?:J|j)|(?:[0-9](?:(?:_)?[0-9])*(?:e|E)(?:(?:\\+|\\-))?[0-9](?:(?:_)?[0-9])*|(?:[0-9](?:(?:_)?[0-9])*\\.(?:[0-9](?:(?:_)?[0-9])*)?|\\.[0-9](?:(?:_)?[0-9])*)(?:(?:e|E)(?:(?:\\+|\\-))?[0-9](?:(?:_)?[0-9])*)?)|0(?:x|X)(?:(?:_)?(?:[0-9]|[a-f]|[A-F]))+|0(?:b|B)(?:(?:_)?[0-1])+|0(?:o|O)(?:(?:_)?[0-7])+|(?:(?i:([ubf]?r?|r[ubf])('([^\\\\']|.)*?'))|(?i:([ubf]?r?|r[ubf])(\"([^\\\"]|.)*?\")))|(?:(?:\r?\n[\t ]*|#[^\n]*))+|[1-9](?:(?:_)?[0-9])*|\\\\[\t \x0c]*\r?\n|continue|nonlocal|assert|global|import|lambda|return|async|await|break|class|False|match|raise|while|yield|case|from|None|pass|True|with|def|del|for|not|try|if|[^\\W\\d]\\w*|#[^\n]*|[\t \x0c]+|\\.\\.\\.|@|\\{|\\(|\\[|\\-|\\+|\\*|\\~"
 
@@ -364,8 +244,7 @@ def test_create_fsm_index_tokenizer(hf_tokenizer_uri, revision):
     num_bytes_fsm_states = len(bytes_fsm.states)
     assert num_bytes_fsm_states == 235
 
-    tokenizer = AutoTokenizer.from_pretrained(hf_tokenizer_uri, revision=revision)
-    tokenizer = TransformerTokenizer(tokenizer)
+    tokenizer = pretrained_tokenizer
 
     states_to_token_subsets, empty_token_ids = create_fsm_index_tokenizer(
         bytes_fsm, tokenizer
@@ -583,3 +462,21 @@ def test_reduced_vocabulary_with_byte_tokens():
     # See fsm.regex.get_token_transition_keys()
     # FSM transition keys represents bytes as <null_prefix><hex_byte>
     assert tokens_to_token_ids[0] == {"string": [1], "\x00A1": [2]}
+
+
+def test_reduced_vocabulary_rs_is_cached():
+    class MockTokenizer:
+        vocabulary = {"a": 1, "b": 2, "eos": 3}
+        special_tokens = {"eos"}
+        eos_token_id = 3
+
+        def convert_token_to_string(self, token):
+            return token
+
+    tokenizer = MockTokenizer()
+
+    vocabulary, empty_token_ids = reduced_vocabulary_rs(tokenizer)
+    assert isinstance(vocabulary, Vocabulary)
+    assert empty_token_ids == set()
+    assert reduced_vocabulary_rs(tokenizer)[0] is vocabulary
+    assert reduced_vocabulary_rs(MockTokenizer())[0] is not vocabulary
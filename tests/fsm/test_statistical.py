@@ -1,4 +1,4 @@
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional
 
 import numpy as np
 from outlines_core.fsm.guide import RegexGuide
@@ -33,25 +33,34 @@ def test_generate_length():
             self.rng = np.random.default_rng(_seed)
             self.prob = _prob
             self.p0 = _p0
-            self.states = _states
+            self.states = np.asarray(_states)
 
         def __call__(
-            self, tokens: Optional[List[int]], *, mask: List[int]
+            self, tokens: Optional[List[int]], *, mask: np.ndarray
         ) -> List[int]:
             prob = self.prob(tokens) if tokens is not None else self.p0
-            prob = prob * np.array(mask)
-            next_t = [self.rng.choice(self.states, p=prob / np.sum(prob))]
+            prob = prob * mask
+            prob /= prob.sum()
+            next_t = [self.rng.choice(self.states, p=prob)]
             return tokens + next_t if tokens is not None else next_t
 
-    def generate(model, tokenizer, regex_str) -> Optional[List[int]]:
+    def generate(
+        model, tokenizer, fsm, masks: Dict[int, np.ndarray]
+    ) -> Optional[List[int]]:
         n_tokens = tokenizer.length()
 
-        fsm = RegexGuide.from_regex(regex_str, tokenizer)
         state: int = fsm.initial_state
         tokens = None
         while state != -1:
-            allowed = fsm.get_next_instruction(state).tokens
-            mask: List[int] = [1 if s in allowed else 0 for s in range(1, n_tokens + 1)]
+            mask = masks.get(state)
+            if mask is None:
+                allowed = set(fsm.get_next_instruction(state).tokens.tolist())
+                mask = np.fromiter(
+                    (1 if s in allowed else 0 for s in range(1, n_tokens + 1)),
+                    dtype=np.uint8,
+                    count=n_tokens,
+                )
+                masks[state] = mask
             tokens = model(tokens, mask=mask)
             state = fsm.get_next_state(state, tokens[-1])
         return tokens
@@ -76,15 +85,17 @@ def test_generate_length():
     n_samples: int = 250
     regex_str: str = r"11[01]+|0[01]*"
     tokenizer = MockTokenizer()
+    fsm = RegexGuide.from_regex(regex_str, tokenizer)
+    masks: Dict[int, np.ndarray] = {}
     model1 = NextToken(prob_markov, p0, states, 30127)
     model2 = NextToken(prob_non_markov, p0, states, 24601)
 
     lengths1: np.array = np.zeros((n_samples,))
     lengths2: np.array = np.zeros((n_samples,))
     for i in range(n_samples):
-        out1: List[int] = generate(model1, tokenizer, regex_str)
+        out1: List[int] = generate(model1, tokenizer, fsm, masks)
         lengths1[i] = len(out1) - 1  # take off the eos token
-        out2: List[int] = generate(model2, tokenizer, regex_str)
+        out2: List[int] = generate(model2, tokenizer, fsm, masks)
         lengths2[i] = len(out2) - 1  # take off the eos token
 
     # 2 sample KS test to check that lengths has the same distribution as